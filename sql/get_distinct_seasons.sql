@@ -0,0 +1,10 @@
+-- Seasons that have at least one game, newest first.
+create or replace function get_distinct_seasons()
+returns table (season int)
+language sql
+stable
+as $$
+    select distinct g.season::int
+    from game g
+    order by 1 desc;
+$$;
@@ -0,0 +1,10 @@
+-- Every pool member, in byte order to match Python's sorted().
+create or replace function get_distinct_usernames()
+returns table (username text)
+language sql
+stable
+as $$
+    select distinct u.username::text
+    from "User" u
+    order by 1 collate "C";
+$$;
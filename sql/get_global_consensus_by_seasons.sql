@@ -0,0 +1,12 @@
+-- Pool consensus (pick count and home pick %) for every game in the given seasons.
+-- Wraps get_game_consensus so callers pass seasons instead of batches of game ids.
+create or replace function get_global_consensus_by_seasons(seasons int[])
+returns table (game_id bigint, total_picks bigint, home_pick_pct numeric)
+language sql
+stable
+as $$
+    select c.game_id::bigint, c.total_picks::bigint, c.home_pick_pct::numeric
+    from get_game_consensus(
+        array(select g.game_id from game g where g.season = any(seasons))
+    ) c;
+$$;
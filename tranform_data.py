@@ -1,6 +1,7 @@
 import os
 import re
-import openpyxl
+import pandas as pd
+from python_calamine import CalamineWorkbook
 from dotenv import load_dotenv
 from supabase import create_client
 
@@ -8,6 +9,8 @@ from supabase import create_client
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Max picks sent per upsert request, to stay well under PostgREST payload limits
+CHUNK = 1000
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("Missing Supabase credentials in .env file")
@@ -15,31 +18,39 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 #create a client to access supabase
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+#Read a sheet into a list of equal-length rows, so grid[row - 1][col - 1] is the value at (row, col)
+#Empty cells become None and whole-number floats become ints (as openpyxl read them), so str() gives "3" not "3.0"
+#Short sheets are padded to the header rows, first pick row and username column
+def sheet_grid(sheet):
+    rows = [
+        [None if val == "" else int(val) if isinstance(val, float) and val.is_integer() else val for val in row]
+        for row in sheet.to_python(skip_empty_area=False)
+    ]
+    rows += [[] for _ in range(8 - len(rows))]
+    width = max(3, max(len(row) for row in rows))
+    return [row + [None] * (width - len(row)) for row in rows]
+
 #Called by the main function to process given workbook and for specified season year
 def upload_pool_data(workbook_path, season_year):
     print(f"📂 Opening Workbook: {workbook_path} for Season: {season_year}")
     
     try:
-        wb = openpyxl.load_workbook(workbook_path, data_only=True)
-    except FileNotFoundError:
+        wb = CalamineWorkbook.from_path(workbook_path)
+    except OSError:
         print("❌ Error: File not found.")
         return
 
+    # Each Week sheet is parsed once and shared by the user scan and the week processing
+    week_grids = {
+        name: sheet_grid(wb.get_sheet_by_name(name))
+        for name in wb.sheet_names if "week" in name.lower()
+    }
+
     # --- 1. PROCESS USERS (Scan all Week Sheets) ---
     # Old workbooks only showed users that made picks each week, so the function needs to scan all sheets
     print("👤 Processing Users across all sheets...")
-    unique_usernames = set()
-    
-    for sheet in wb.worksheets:
-        # process sheets that start with "Week"
-        if "week" not in sheet.title.lower():
-            continue
-
-        for row in sheet.iter_rows(min_row=8, min_col=3, max_col=3):
-            cell = row[0]
-            username = cell.value
-            if username:
-                unique_usernames.add(str(username).strip())
+    all_usernames = [row[2] for grid in week_grids.values() for row in grid[7:] if row[2]]
+    unique_usernames = pd.unique(pd.Series(all_usernames, dtype=object).astype(str).str.strip())
 
     users_to_upsert = [
         {"username": name, f"season_{season_year}": True} 
@@ -57,8 +68,8 @@ def upload_pool_data(workbook_path, season_year):
         print("⚠️ No users found in any Week sheets.")
 
     # --- 2. PROCESS WEEKS (Iterate Sheets) ---
-    for sheet in wb.worksheets:
-        sheet_title = sheet.title.strip()
+    for sheet_name, grid in week_grids.items():
+        sheet_title = sheet_name.strip()
         week_match = re.search(r"Week\s+(\d+)", sheet_title, re.IGNORECASE)
         if not week_match:
             continue
@@ -68,11 +79,11 @@ def upload_pool_data(workbook_path, season_year):
 
         # --- A. IDENTIFY VALID GAME COLUMNS FIRST ---
         valid_game_cols = []
-        max_col = sheet.max_column
+        max_col = len(grid[0])
 
         for col_idx in range(4, max_col + 1):
-            row_8_val = sheet.cell(row=8, column=col_idx).value
-            away_team_val = sheet.cell(row=4, column=col_idx).value
+            row_8_val = grid[7][col_idx - 1]
+            away_team_val = grid[3][col_idx - 1]
 
             if row_8_val is not None and away_team_val is not None:
                 valid_game_cols.append(col_idx)
@@ -82,20 +93,23 @@ def upload_pool_data(workbook_path, season_year):
             continue
 
         mnf_col_index = valid_game_cols[-1]
+        mnf_tot_col = mnf_col_index + 3
+        home_abbrs = {col_idx: str(grid[1][col_idx - 1]).strip() for col_idx in valid_game_cols}
         print(f"   🏈 Detected {len(valid_game_cols)} Games. MNF is at Column {mnf_col_index}")
 
         # --- B. UPSERT GAMES ---
         col_to_game_id = {}
+        game_payloads = {}
+        col_to_matchup = {}
 
         for col_idx in valid_game_cols:
             is_mnf = (col_idx == mnf_col_index)
 
-            home_score = sheet.cell(row=1, column=col_idx).value
-            home_team = sheet.cell(row=2, column=col_idx).value
-            home_spread = sheet.cell(row=3, column=col_idx).value
-            away_team = sheet.cell(row=4, column=col_idx).value
-            away_score = sheet.cell(row=5, column=col_idx).value
-            ot_val = sheet.cell(row=7, column=col_idx).value
+            home_score = grid[0][col_idx - 1]
+            home_spread = grid[2][col_idx - 1]
+            away_team = grid[3][col_idx - 1]
+            away_score = grid[4][col_idx - 1]
+            ot_val = grid[6][col_idx - 1]
 
             try:
                 h_score = int(float(home_score)) if home_score is not None else 0
@@ -111,11 +125,14 @@ def upload_pool_data(workbook_path, season_year):
                 print(f"⚠️ Data error in Col {col_idx}, skipping.")
                 continue
 
-            game_payload = {
+            matchup = (home_abbrs[col_idx], str(away_team).strip())
+            col_to_matchup[col_idx] = matchup
+            # Keyed by matchup so a repeated game is sent once (last column wins)
+            game_payloads[matchup] = {
                 "season": season_year,
                 "week": week_num,
-                "home_team_id": str(home_team).strip(),
-                "away_team_id": str(away_team).strip(),
+                "home_team_id": matchup[0],
+                "away_team_id": matchup[1],
                 "home_score": h_score,
                 "away_score": a_score,
                 "home_spread": spread,
@@ -125,23 +142,26 @@ def upload_pool_data(workbook_path, season_year):
                 "mnf": is_mnf
             }
 
+        if game_payloads:
             try:
                 res = supabase.table("game").upsert(
-                    game_payload, 
+                    list(game_payloads.values()), 
                     on_conflict="season,week,home_team_id,away_team_id"
                 ).execute()
-                
-                if res.data:
-                    col_to_game_id[col_idx] = res.data[0]['game_id']
+
+                matchup_to_game_id = {(g['home_team_id'], g['away_team_id']): g['game_id'] for g in res.data or []}
+                for col_idx, matchup in col_to_matchup.items():
+                    if matchup in matchup_to_game_id:
+                        col_to_game_id[col_idx] = matchup_to_game_id[matchup]
             except Exception as e:
-                print(f"❌ Error uploading game: {e}")
+                print(f"❌ Error uploading games: {e}")
 
         # --- C. PROCESS PICKS ---
         picks_to_upsert = []
-        
-        for row_idx in range(8, sheet.max_row + 1):
-            username_val = sheet.cell(row=row_idx, column=3).value
-            status_val = sheet.cell(row=row_idx, column=2).value
+
+        for row_vals in grid[7:]:
+            username_val = row_vals[2]
+            status_val = row_vals[1]
             
             if not username_val:
                 continue
@@ -157,8 +177,8 @@ def upload_pool_data(workbook_path, season_year):
                 game_id = col_to_game_id.get(col_idx)
                 if not game_id: continue
 
-                pick_cell_val = sheet.cell(row=row_idx, column=col_idx).value
-                home_team_abbr = str(sheet.cell(row=2, column=col_idx).value).strip()
+                pick_cell_val = row_vals[col_idx - 1]
+                home_team_abbr = home_abbrs[col_idx]
                 
                 pick_home = False
                 
@@ -171,8 +191,7 @@ def upload_pool_data(workbook_path, season_year):
 
                 tot_points = None
                 if col_idx == mnf_col_index:
-                    target_col = mnf_col_index + 3
-                    tot_val = sheet.cell(row=row_idx, column=target_col).value
+                    tot_val = row_vals[mnf_tot_col - 1] if mnf_tot_col <= max_col else None
                     if tot_val:
                         try:
                             tot_points = int(float(tot_val))
@@ -190,10 +209,11 @@ def upload_pool_data(workbook_path, season_year):
         
         if picks_to_upsert:
             try:
-                supabase.table("pick").upsert(
-                    picks_to_upsert, 
-                    on_conflict="username,game_id"
-                ).execute()
+                for i in range(0, len(picks_to_upsert), CHUNK):
+                    supabase.table("pick").upsert(
+                        picks_to_upsert[i:i + CHUNK], 
+                        on_conflict="username,game_id"
+                    ).execute()
                 print(f"   ✅ Processed {len(picks_to_upsert)} picks.")
             except Exception as e:
                 print(f"   ❌ Error uploading picks: {e}")